@@ -1,4 +1,5 @@
 """Docstring for the orders view."""
+
 from __future__ import annotations
 
 import pathlib
@@ -6,5 +7,10 @@ import pathlib
 import pandas as pd
 
 here = pathlib.Path(__file__).parent
-orders = pd.read_csv(here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_orders.csv")
+orders = pd.read_csv(
+    here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_orders.csv",
+    engine="pyarrow",
+    # Arrow would parse the dates, whereas the default engine leaves them as strings
+    dtype={"order_date": "str"},
+)
 orders = orders.rename(columns={"id": "order_id", "user_id": "customer_id"})
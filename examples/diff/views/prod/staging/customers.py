@@ -8,6 +8,7 @@ import pandas as pd
 
 here = pathlib.Path(__file__).parent
 customers = pd.read_csv(
-    here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_customers.csv"
+    here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_customers.csv",
+    engine="pyarrow",
 )
 customers = customers.rename(columns={"id": "customer_id"})
@@ -6,7 +6,8 @@ import pandas as pd
 
 here = pathlib.Path(__file__).parent
 payments = pd.read_csv(
-    here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_payments.csv"
+    here.parents[3] / "jaffle_shop" / "jaffle_shop" / "seeds" / "raw_payments.csv",
+    engine="pyarrow",
 )
 payments = payments.rename(columns={"id": "payment_id"})
 payments["amount"] = payments["amount"] / 100  # convert cents to dollars
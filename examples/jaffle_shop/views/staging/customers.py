@@ -7,5 +7,7 @@ import pathlib
 import pandas as pd
 
 here = pathlib.Path(__file__).parent
-customers = pd.read_csv(here.parent.parent / "jaffle_shop" / "seeds" / "raw_customers.csv")
+customers = pd.read_csv(
+    here.parent.parent / "jaffle_shop" / "seeds" / "raw_customers.csv", engine="pyarrow"
+)
 customers = customers.rename(columns={"id": "customer_id"})
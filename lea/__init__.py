@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-from lea import cli, databases
-from lea.conductor import Conductor
+import importlib
 
 __all__ = ["cli", "Conductor", "databases"]
+
+
+def __getattr__(name: str):
+    # The submodules import heavy dependencies, such as the BigQuery client and sqlglot. They are
+    # therefore only imported when they are accessed, which keeps `import lea` cheap.
+    if name == "Conductor":
+        from lea.conductor import Conductor
+
+        return Conductor
+    if name in {"cli", "databases"}:
+        return importlib.import_module(f"lea.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-import collections
-import pathlib
+import os
 
 import click
 
@@ -31,17 +30,18 @@ def run(select, unselect, dataset, scripts, incremental, dry, print, production,
     if select in {"", "Ø"}:
         select = []
 
-    if not pathlib.Path(scripts).is_dir():
+    if not os.path.isdir(scripts):
         raise click.ClickException(f"Directory {scripts} does not exist")
 
     # Handle incremental option
-    incremental_field_values = collections.defaultdict(set)
+    incremental_field_name = None
+    incremental_field_values = set()
     for field, value in incremental:
-        incremental_field_values[field].add(value)
-    if len(incremental_field_values) > 1:
-        raise click.ClickException("Specifying multiple incremental fields is not supported")
-    incremental_field_name = next(iter(incremental_field_values), None)
-    incremental_field_values = incremental_field_values[incremental_field_name]
+        if incremental_field_name is None:
+            incremental_field_name = field
+        elif field != incremental_field_name:
+            raise click.ClickException("Specifying multiple incremental fields is not supported")
+        incremental_field_values.add(value)
 
     conductor = lea.Conductor(scripts_dir=scripts, dataset_name=dataset)
     conductor.run(
@@ -4,6 +4,7 @@ import concurrent.futures
 import dataclasses
 import datetime as dt
 import enum
+import functools
 import getpass
 import json
 import logging
@@ -55,7 +56,7 @@ class JobStatus(enum.Enum):
         return self.value
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Job:
     table_ref: TableRef
     is_test: bool
@@ -112,6 +113,9 @@ class Session:
         self.run_script_futures_complete: dict = {}
         self.promote_audit_tables_futures: dict = {}
         self.stop_event = threading.Event()
+        # Errors are flagged as they happen, so that checking for them doesn't require going
+        # through every job and future, which the scheduler does at each iteration.
+        self.error_event = threading.Event()
 
         if self.incremental_field_name is not None:
             self.filterable_table_refs = {
@@ -137,6 +141,31 @@ class Session:
             self.filterable_table_refs = set()
             self.incremental_table_refs = set()
 
+        # The following are the same for every script, so we compute them once rather than each
+        # time a script is contextualized. One caveat is the dependencies which are not incremental
+        # do not have to be filtered. Indeed, they are already filtered by the fact that they are
+        # incremental.
+        self.dependencies_to_filter = self.filterable_table_refs - self.incremental_table_refs
+        self.incremental_dependencies = {
+            incremental_table_ref: incremental_table_ref.add_audit_suffix()
+            for incremental_table_ref in self.incremental_table_refs
+        }
+
+    @property
+    def existing_audit_tables(self) -> dict[TableRef, TableStats]:
+        return self._existing_audit_tables
+
+    @existing_audit_tables.setter
+    def existing_audit_tables(self, existing_audit_tables: dict[TableRef, TableStats]):
+        self._existing_audit_tables = existing_audit_tables
+        # A dependency has to be read from its audit table if it is selected, or if its audit table
+        # already exists. This set is checked for every dependency of every script, so we compute
+        # it once, and again only if the existing audit tables change.
+        self.table_refs_with_audit_table = self.selected_table_refs | {
+            self.remove_write_context_from_table_ref(table_ref)
+            for table_ref in existing_audit_tables
+        }
+
     def add_write_context_to_table_ref(self, table_ref: TableRef) -> TableRef:
         table_ref = table_ref.replace_dataset(self.write_dataset)
         table_ref = table_ref.add_audit_suffix()
@@ -153,12 +182,7 @@ class Session:
                 return None
 
             if (
-                dependency.replace_dataset(self.base_dataset)
-                in self.selected_table_refs
-                | {
-                    self.remove_write_context_from_table_ref(table_ref)
-                    for table_ref in self.existing_audit_tables
-                }
+                dependency.replace_dataset(self.base_dataset) in self.table_refs_with_audit_table
                 and dependency.replace_dataset(self.base_dataset) in self.scripts
             ):
                 dependency = dependency.add_audit_suffix()
@@ -179,10 +203,7 @@ class Session:
                     code=script.code,
                     incremental_field_name=self.incremental_field_name,
                     incremental_field_values=self.incremental_field_values,
-                    # One caveat is the dependencies which are not incremental do not have to be
-                    # filtered. Indeed, they are already filtered by the fact that they are
-                    # incremental.
-                    dependencies_to_filter=self.filterable_table_refs - self.incremental_table_refs,
+                    dependencies_to_filter=self.dependencies_to_filter,
                 ),
             )
 
@@ -198,10 +219,7 @@ class Session:
                     code=script.code,
                     incremental_field_name=self.incremental_field_name,
                     incremental_field_values=self.incremental_field_values,
-                    incremental_dependencies={
-                        incremental_table_ref: incremental_table_ref.add_audit_suffix()
-                        for incremental_table_ref in self.incremental_table_refs
-                    },
+                    incremental_dependencies=self.incremental_dependencies,
                 ),
             )
 
@@ -238,28 +256,34 @@ class Session:
         base_delay = 1
         max_delay = 10
         retries = 0
-        checked_at = dt.datetime.now()
+        # A monotonic clock is used to space out the progress logs, so that they are not affected
+        # by changes to the system clock.
+        checked_at = time.monotonic()
 
         while not self.stop_event.is_set():
             if not job.database_job.is_done:
                 delay = min(max_delay, base_delay * (2**retries))
                 retries += 1
-                if (now := dt.datetime.now()) - checked_at >= dt.timedelta(seconds=10):
-                    duration_str = str(now - job.started_at).split(".")[0]
+                if (now := time.monotonic()) - checked_at >= 10:
+                    duration_str = str(dt.datetime.now() - job.started_at).split(".")[0]
                     log.info(f"{job.status} {job.table_ref} after {duration_str}")
                     checked_at = now
-                time.sleep(delay)
+                # Waiting on the stop event instead of sleeping means we wake up straight away if
+                # the session is ended, rather than holding up the executor's shutdown.
+                self.stop_event.wait(delay)
                 continue
 
             # Case 1: the job raised an exception
             if (exception := job.database_job.exception) is not None:
                 job.status = JobStatus.ERRORED
+                self.error_event.set()
                 log.error(f"{job.status} {job.table_ref}\n{exception}")
 
             # Case 2: the job succeeded, but it's a test and there are negative cases
-            elif job.is_test and not (dataframe := job.database_job.result).empty:
+            elif job.is_test and not (dataframe := job.database_job.head()).empty:
                 job.status = JobStatus.ERRORED
-                log.error(f"{job.status} {job.table_ref}\n{dataframe.head()}")
+                self.error_event.set()
+                log.error(f"{job.status} {job.table_ref}\n{dataframe}")
 
             # Case 3: the job succeeded!
             else:
@@ -313,9 +337,7 @@ class Session:
 
     @property
     def any_error_has_occurred(self) -> bool:
-        return any(job.status == JobStatus.ERRORED for job in self.jobs) or any(
-            future.exception() is not None for future in self.run_script_futures_complete
-        )
+        return self.error_event.is_set()
 
     @property
     def total_billed_dollars(self) -> float:
@@ -343,11 +365,13 @@ def replace_script_dependencies(
             dependency_to_edit.replace_project(None)
         )
         new_dependency_str = script.sql_dialect.format_table_ref(new_dependency)
-        code = re.sub(
-            rf"\b{dependency_to_edit_without_project_str}\b",
-            new_dependency_str,
-            code,
-        )
+        # Scanning the code is wasteful when the reference stays the same, which is common
+        if new_dependency_str != dependency_to_edit_without_project_str:
+            code = re.sub(
+                rf"\b{dependency_to_edit_without_project_str}\b",
+                new_dependency_str,
+                code,
+            )
 
         # We also have to handle the case where the table is referenced to access a field.
         # TODO: refactor this with the above
@@ -363,11 +387,12 @@ def replace_script_dependencies(
         new_dependency_without_dataset_str = script.sql_dialect.format_table_ref(
             new_dependency_without_dataset
         )
-        code = re.sub(
-            rf"\b{dependency_to_edit_without_dataset_str}\b",
-            new_dependency_without_dataset_str,
-            code,
-        )
+        if new_dependency_without_dataset_str != dependency_to_edit_without_dataset_str:
+            code = re.sub(
+                rf"\b{dependency_to_edit_without_dataset_str}\b",
+                new_dependency_without_dataset_str,
+                code,
+            )
 
     return dataclasses.replace(script, code=code)
 
@@ -391,6 +416,23 @@ def delete_table_refs(
             log.info(f"Deleted {futures[future]}")
 
 
+@functools.lru_cache
+def load_service_account_credentials(service_account_info: str, scopes: tuple[str, ...]):
+    """Parse service account credentials, once per process.
+
+    The credentials fetch an access token the first time they're used, and refresh it when it
+    expires. Reusing them across runs, for instance when a Conductor is run several times from a
+    notebook, avoids parsing the key and going through the token exchange again.
+
+    """
+    # Do imports here to avoid loading them all the time
+    from google.oauth2 import service_account
+
+    return service_account.Credentials.from_service_account_info(
+        json.loads(service_account_info, strict=False), scopes=list(scopes)
+    )
+
+
 class Conductor:
     def __init__(
         self, scripts_dir: str, dataset_name: str | None = None, project_name: str | None = None
@@ -431,16 +473,13 @@ class Conductor:
 
     def make_client(self, dry_run: bool = False, print_mode: bool = False) -> DatabaseClient:
         if self.warehouse.lower() == "bigquery":
-            # Do imports here to avoid loading them all the time
-            from google.oauth2 import service_account
-
             scopes_str = os.environ.get("LEA_BQ_SCOPES", "https://www.googleapis.com/auth/bigquery")
             scopes = scopes_str.split(",")
             scopes = [scope.strip() for scope in scopes]
 
             credentials = (
-                service_account.Credentials.from_service_account_info(
-                    json.loads(bq_service_account_info_str, strict=False), scopes=scopes
+                load_service_account_credentials(
+                    service_account_info=bq_service_account_info_str, scopes=tuple(scopes)
                 )
                 if (bq_service_account_info_str := os.environ.get("LEA_BQ_SERVICE_ACCOUNT"))
                 is not None
@@ -492,8 +531,8 @@ class Conductor:
 
         # We need to select the scripts we want to run. We do this by querying the DAG.
         selected_table_refs = self.dag.select(*select)
-        unselected_table_refs = self.dag.select(*unselect)
-        selected_table_refs -= unselected_table_refs
+        if unselect:
+            selected_table_refs -= self.dag.select(*unselect)
         if not selected_table_refs:
             msg = "Nothing found for select " + ", ".join(select)
             if unselect:
@@ -567,6 +606,9 @@ def run_scripts(dag: DAGOfScripts, session: Session):
         base_dataset=session.base_dataset,
     )
     log.info("🔵 Creating audit tables")
+    # The DAG is keyed by the table references of the original scripts. We keep track of them when
+    # scripts are submitted, rather than removing the write context once the scripts are done.
+    dag_table_refs: dict[concurrent.futures.Future, TableRef] = {}
     dag.prepare()
     while dag.is_active():
         # If we're in early end mode, we need to check if any script errored, in which case we
@@ -579,9 +621,11 @@ def run_scripts(dag: DAGOfScripts, session: Session):
         for script_to_run in dag.iter_scripts(table_refs_to_run):
             # Before executing a script, we need to contextualize it. We have to edit its
             # dependencies, add incremental logic, and set the write context.
+            table_ref = script_to_run.table_ref
             script_to_run = session.add_context_to_script(script_to_run)
             future = session.executor.submit(session.run_script, script_to_run)
             session.run_script_futures[future] = script_to_run
+            dag_table_refs[future] = table_ref
 
         # Check for scripts that have finished
         done, _ = concurrent.futures.wait(
@@ -591,9 +635,9 @@ def run_scripts(dag: DAGOfScripts, session: Session):
             script_done = session.run_script_futures[future]
             if exception := future.exception():
                 log.error(f"Failed running {script_done.table_ref}\n{exception}")
-            table_ref = session.remove_write_context_from_table_ref(script_done.table_ref)
+                session.error_event.set()
             session.run_script_futures_complete[future] = session.run_script_futures.pop(future)
-            dag.done(table_ref)
+            dag.done(dag_table_refs.pop(future))
 
 
 def promote_audit_tables(session: Session):
@@ -631,7 +675,9 @@ def delete_audit_tables(session: Session):
         delete_table_refs(
             table_refs=table_refs_to_delete,
             database_client=session.database_client,
-            executor=concurrent.futures.ThreadPoolExecutor(max_workers=None),
+            # The session's executor is still running at this point, there's no need to spin up
+            # another one, which would also have to be shut down
+            executor=session.executor,
             verbose=False,
         )
         session.existing_audit_tables = {}
@@ -663,14 +709,17 @@ def determine_table_refs_to_run(
         table_ref.remove_audit_suffix().replace_dataset(base_dataset): stats
         for table_ref, stats in existing_audit_tables.items()
     }
-    table_refs_to_run = selected_table_refs.copy()
-    table_refs_to_run -= set(normalized_existing_audit_tables)
+    table_refs_to_run = selected_table_refs.difference(normalized_existing_audit_tables)
 
-    for table_ref in selected_table_refs & set(normalized_existing_audit_tables):
+    for table_ref in selected_table_refs.intersection(normalized_existing_audit_tables):
         script = dag.scripts[table_ref]
         if script.updated_at > normalized_existing_audit_tables[table_ref].updated_at:
             log.info(f"{table_ref} modified, re-running it")
             table_refs_to_run.add(table_ref)
-            table_refs_to_run |= set(dag.iter_descendants(table_ref)) & selected_table_refs
+            table_refs_to_run.update(
+                descendant
+                for descendant in dag.iter_descendants(table_ref)
+                if descendant in selected_table_refs
+            )
 
     return table_refs_to_run
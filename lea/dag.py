@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import functools
 import graphlib
 import pathlib
 import re
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 
 import git
 
@@ -11,6 +12,8 @@ from .dialects import SQLDialect
 from .scripts import Script, read_scripts
 from .table_ref import TableRef
 
+QUERY_REGEX = re.compile(r"(?P<ancestors>\+?)(?P<body>.*?)(?P<descendants>\+?)")
+
 
 class DAGOfScripts(graphlib.TopologicalSorter):
     def __init__(
@@ -68,12 +71,34 @@ class DAGOfScripts(graphlib.TopologicalSorter):
     def select(self, *queries: str) -> set[TableRef]:
         """Select a subset of the views in the DAG."""
 
-        def _select(
-            query: str,
-            include_ancestors: bool = False,
-            include_descendants: bool = False,
-        ):
-            if query == "*":
+        # Diffing the git repository is slow, so we do it at most once, even if there are several
+        # git queries, such as `git+` and `+git`.
+        @functools.cache
+        def list_changed_table_refs() -> set[TableRef]:
+            return list_table_refs_that_changed(
+                scripts_dir=self.scripts_dir, project_name=self.project_name
+            )
+
+        # Queries often overlap, for instance `core/+` and `core.users+`, so each traversal is done
+        # at most once per table.
+        @functools.cache
+        def list_ancestors(table_ref: TableRef) -> frozenset[TableRef]:
+            return frozenset(self.iter_ancestors(node=table_ref))
+
+        @functools.cache
+        def list_descendants(table_ref: TableRef) -> frozenset[TableRef]:
+            return frozenset(self.iter_descendants(node=table_ref))
+
+        def _select(query: str):
+            # A query is made of a body, which may be prefixed with a `+` to include the ancestors
+            # and suffixed with a `+` to include the descendants. For example, `+core/+` selects the
+            # views in the core schema, as well as their ancestors and descendants.
+            m = QUERY_REGEX.fullmatch(query)
+            include_ancestors = m.group("ancestors") == "+"
+            include_descendants = m.group("descendants") == "+"
+            body = m.group("body")
+
+            if body == "*":
                 yield from self.scripts.keys()
                 return
 
@@ -82,68 +107,47 @@ class DAGOfScripts(graphlib.TopologicalSorter):
             # * `git+` will select all the modified views, and their descendants.
             # * `+git` will select all the modified views, and their ancestors.
             # * `+git+` will select all the modified views, with their ancestors and descendants.
-            if m := re.match(r"(?P<ancestors>\+?)git(?P<descendants>\+?)", query):
-                include_ancestors = include_ancestors or m.group("ancestors") == "+"
-                include_descendants = include_descendants or m.group("descendants") == "+"
-                for table_ref in list_table_refs_that_changed(scripts_dir=self.scripts_dir):
-                    yield from _select(
-                        ".".join([*table_ref.schema, table_ref.name]),
-                        include_ancestors=include_ancestors,
-                        include_descendants=include_descendants,
+            if body == "git":
+                table_refs = [
+                    table_ref.replace_dataset(self.dataset_name)
+                    for table_ref in list_changed_table_refs()
+                ]
+            elif "/" in body:
+                schema = tuple(body.strip("/").split("/"))
+                table_refs = self.table_refs_by_schema.get(schema, [])
+            else:
+                *schema, name = body.split(".")
+                table_refs = [
+                    TableRef(
+                        dataset=self.dataset_name,
+                        schema=tuple(schema),
+                        name=name,
+                        project=self.project_name,
                     )
-                return
+                ]
 
-            if query.endswith("+"):
-                yield from _select(
-                    query=query[:-1],
-                    include_ancestors=include_ancestors,
-                    include_descendants=True,
-                )
-                return
+            for table_ref in table_refs:
+                yield table_ref
+                if include_ancestors:
+                    yield from list_ancestors(table_ref)
+                if include_descendants:
+                    yield from list_descendants(table_ref)
 
-            if query.startswith("+"):
-                yield from _select(
-                    query=query[1:],
-                    include_ancestors=True,
-                    include_descendants=include_descendants,
-                )
-                return
+        all_selected_table_refs: set[TableRef] = set()
+        for query in queries:
+            all_selected_table_refs.update(_select(query))
 
-            if "/" in query:
-                schema = tuple(query.strip("/").split("/"))
-                for table_ref in self.dependency_graph:
-                    if table_ref.schema == schema:
-                        yield from _select(
-                            ".".join([*table_ref.schema, table_ref.name]),
-                            include_ancestors=include_ancestors,
-                            include_descendants=include_descendants,
-                        )
-                return
+        # Some nodes in the graph are not part of the views, such as external dependencies
+        all_selected_table_refs.intersection_update(self.scripts)
+        return all_selected_table_refs
 
-            *schema, name = query.split(".")
-            table_ref = TableRef(
-                dataset=self.dataset_name,
-                schema=tuple(schema),
-                name=name,
-                project=self.project_name,
-            )
-            yield table_ref
-            if include_ancestors:
-                yield from self.iter_ancestors(node=table_ref)
-            if include_descendants:
-                yield from self.iter_descendants(node=table_ref)
-
-        all_selected_table_refs = set()
-        for query in queries:
-            selected_table_refs = set(_select(query))
-            all_selected_table_refs.update(selected_table_refs)
-
-        return {
-            table_ref
-            for table_ref in all_selected_table_refs
-            # Some nodes in the graph are not part of the views, such as external dependencies
-            if table_ref in self.scripts
-        }
+    @functools.cached_property
+    def table_refs_by_schema(self) -> dict[tuple[str, ...], list[TableRef]]:
+        """Group the nodes of the DAG by schema, so that schemas can be selected quickly."""
+        table_refs_by_schema: dict[tuple[str, ...], list[TableRef]] = {}
+        for table_ref in self.dependency_graph:
+            table_refs_by_schema.setdefault(table_ref.schema, []).append(table_ref)
+        return table_refs_by_schema
 
     def iter_scripts(self, table_refs: set[TableRef]) -> Iterator[Script]:
         """Loop over scripts in topological order.
@@ -169,18 +173,39 @@ class DAGOfScripts(graphlib.TopologicalSorter):
             yield self.scripts[table_ref]
 
     def iter_ancestors(self, node: TableRef):
-        for child in self.dependency_graph.get(node, []):
-            yield child
-            yield from self.iter_ancestors(node=child)
+        yield from iter_reachable_nodes(graph=self.dependency_graph, node=node)
+
+    @functools.cached_property
+    def dependents_graph(self) -> dict[TableRef, list[TableRef]]:
+        """Reverse of the dependency graph: map each node to the nodes that depend on it."""
+        dependents_graph: dict[TableRef, list[TableRef]] = {}
+        for table_ref, dependencies in self.dependency_graph.items():
+            for dependency in dependencies:
+                dependents_graph.setdefault(dependency, []).append(table_ref)
+        return dependents_graph
 
     def iter_descendants(self, node: TableRef):
-        for potential_child in self.dependency_graph:
-            if node in self.dependency_graph[potential_child]:
-                yield potential_child
-                yield from self.iter_descendants(node=potential_child)
+        yield from iter_reachable_nodes(graph=self.dependents_graph, node=node)
+
+
+def iter_reachable_nodes(graph: dict[TableRef, Iterable[TableRef]], node: TableRef):
+    """Yield each node reachable from the given node, once.
+
+    Nodes which are reachable through several paths, which is common in a DAG, are only visited the
+    first time they are encountered.
+
+    """
+    seen = {node}
+    stack = [node]
+    while stack:
+        for child in graph.get(stack.pop(), []):
+            if child not in seen:
+                seen.add(child)
+                yield child
+                stack.append(child)
 
 
-def list_table_refs_that_changed(scripts_dir: pathlib.Path) -> set[TableRef]:
+def list_table_refs_that_changed(scripts_dir: pathlib.Path, project_name: str) -> set[TableRef]:
     repo = git.Repo(search_parent_directories=True)
     repo_root = pathlib.Path(repo.working_tree_dir)
 
@@ -204,7 +229,9 @@ def list_table_refs_that_changed(scripts_dir: pathlib.Path) -> set[TableRef]:
             (".sql", ".jinja"),
         }:
             table_ref = TableRef.from_path(
-                scripts_dir=scripts_dir, relative_path=diff_path.relative_to(absolute_scripts_dir)
+                scripts_dir=scripts_dir,
+                relative_path=diff_path.relative_to(absolute_scripts_dir),
+                project_name=project_name,
             )
             table_refs.add(table_ref)
 
@@ -5,6 +5,7 @@ import datetime as dt
 import typing
 
 import pandas as pd
+import requests.adapters
 import rich
 from google.cloud import bigquery
 
@@ -24,6 +25,9 @@ class DatabaseJob(typing.Protocol):
     def result(self) -> pd.DataFrame:
         pass
 
+    def head(self, n: int = 5) -> pd.DataFrame:
+        pass
+
     @property
     def exception(self) -> Exception:
         pass
@@ -70,7 +74,7 @@ class DatabaseClient(typing.Protocol):
         pass
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class BigQueryJob:
     client: BigQueryClient
     query_job: bigquery.QueryJob
@@ -107,12 +111,16 @@ class BigQueryJob:
     def result(self) -> pd.DataFrame:
         return self.query_job.result().to_dataframe()
 
+    def head(self, n: int = 5) -> pd.DataFrame:
+        # Only the first rows are fetched, which matters when a failing test returns many rows
+        return self.query_job.result(max_results=n).to_dataframe(create_bqstorage_client=False)
+
     @property
     def exception(self) -> Exception:
         return self.query_job.exception()
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class TableStats:
     n_rows: int
     n_bytes: int
@@ -138,6 +146,14 @@ class BigQueryClient:
             credentials=self.credentials,
             location=self.location,
         )
+        # Jobs are submitted and monitored from many threads at once, up to 32 with the default
+        # executor, whereas requests only keeps 10 connections per host. Connections beyond that
+        # are thrown away after each request, and opening a new one requires a TLS handshake.
+        # Mutual TLS sessions come with their own adapter, which we leave alone. Note that this
+        # relies on Client._http, which is private, being an AuthorizedSession from google-auth,
+        # which is a requests.Session with an is_mtls attribute.
+        if not self.client._http.is_mtls:
+            self.client._http.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=32))
         self.dry_run = dry_run
         self.print_mode = print_mode
 
@@ -301,16 +317,20 @@ class BigQueryClient:
         query = f"""
         SELECT table_name, column_name
         FROM `{self.write_project_id}.{dataset_name}.INFORMATION_SCHEMA.COLUMNS`
+        ORDER BY table_name, column_name
         """
         job = self.client.query(query, location=self.location)
+        # The rows are streamed in order, so there is no need to build a dataframe and group it
+        fields_by_table_name: dict[str, list[scripts.Field]] = {}
+        for row in job.result():
+            fields_by_table_name.setdefault(row["table_name"], []).append(
+                scripts.Field(name=row["column_name"])
+            )
         return {
             BigQueryDialect.parse_table_ref(
                 f"{self.write_project_id}.{dataset_name}.{table_name}"
-            ): [scripts.Field(name=row["column_name"]) for _, row in rows.iterrows()]
-            for table_name, rows in job.result()
-            .to_dataframe()
-            .sort_values(["table_name", "column_name"])
-            .groupby("table_name")
+            ): fields
+            for table_name, fields in fields_by_table_name.items()
         }
 
     def make_job_config(self, script: scripts.SQLScript, **kwargs) -> bigquery.QueryJobConfig:
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import functools
 import pathlib
 import re
 import textwrap
+import typing
 
 import jinja2
 import sqlglot
-from google.cloud import bigquery
 
 from lea.field import FieldTag
 from lea.table_ref import TableRef
 
+if typing.TYPE_CHECKING:
+    from google.cloud import bigquery
+
+# Schemas are separated by double underscores in BigQuery table names. Triple underscores are not
+# separators: they introduce a suffix, such as the audit table suffix.
+BIGQUERY_SCHEMA_SEPARATOR_REGEX = re.compile(r"(?<!_)__(?!_)")
+
 
 class SQLDialect:
     sqlglot_dialect: sqlglot.dialects.Dialects | None = None
@@ -112,6 +120,7 @@ def remove_comment_lines(code: str) -> str:
     return "\n".join(line for line in code.split("\n") if not line.strip().startswith("--"))
 
 
+@functools.cache
 def load_assertion_test_template(tag: str) -> jinja2.Template:
     return jinja2.Template(
         (pathlib.Path(__file__).parent / "assertions" / f"{tag.lstrip('#')}.sql.jinja").read_text()
@@ -122,6 +131,7 @@ class BigQueryDialect(SQLDialect):
     sqlglot_dialect = sqlglot.dialects.Dialects.BIGQUERY
 
     @staticmethod
+    @functools.cache
     def parse_table_ref(table_ref: str) -> TableRef:
         """
 
@@ -144,10 +154,11 @@ class BigQueryDialect(SQLDialect):
         project, dataset, leftover = None, *tuple(table_ref.rsplit(".", 1))
         if "." in dataset:
             project, dataset = dataset.split(".")
-        *schema, name = tuple(re.split(r"(?<!_)__(?!_)", leftover))
+        *schema, name = tuple(BIGQUERY_SCHEMA_SEPARATOR_REGEX.split(leftover))
         return TableRef(dataset=dataset, schema=tuple(schema), name=name, project=project)
 
     @staticmethod
+    @functools.cache
     def format_table_ref(table_ref: TableRef) -> str:
         table_ref_str = ""
         if table_ref.project:
@@ -158,9 +169,13 @@ class BigQueryDialect(SQLDialect):
         return table_ref_str
 
     @staticmethod
+    @functools.cache
     def convert_table_ref_to_bigquery_table_reference(
         table_ref: TableRef, project: str
     ) -> bigquery.TableReference:
+        # Do imports here to avoid loading them all the time
+        from google.cloud import bigquery
+
         return bigquery.TableReference(
             dataset_ref=bigquery.DatasetReference(project=project, dataset_id=table_ref.dataset),
             table_id=f"{'__'.join([*table_ref.schema, table_ref.name])}",
@@ -9,7 +9,6 @@ import re
 import textwrap
 
 import jinja2
-import rich.syntax
 import sqlglot
 import sqlglot.optimizer
 
@@ -18,6 +17,10 @@ from .dialects import SQLDialect
 from .field import Field, FieldTag
 from .table_ref import TableRef
 
+# Tags which take arguments, such as #UNIQUE_BY(account) or #SET{a, b}
+UNIQUE_BY_TAG_REGEX = re.compile(FieldTag.UNIQUE_BY + r"\((?P<by>.+)\)")
+SET_TAG_REGEX = re.compile(FieldTag.SET + r"\{(?P<elements>\w+(?:,\s*\w+)*)\}")
+
 
 @dataclasses.dataclass(frozen=True)
 class SQLScript:
@@ -50,23 +53,20 @@ class SQLScript:
         field_comments = extract_comments(
             code=self.code, expected_field_names=field_names, sql_dialect=self.sql_dialect
         )
-        fields = [
-            Field(
-                name=name,
-                tags={
-                    comment.text
-                    for comment in field_comments.get(name, [])
-                    if comment.text.startswith("#")
-                },
-                description=" ".join(
-                    comment.text
-                    for comment in field_comments.get(name, [])
-                    if not comment.text.startswith("#")
-                ),
-            )
-            for name in field_names
-            if name != "*"
-        ]
+        fields = []
+        for name in field_names:
+            if name == "*":
+                continue
+            # Each comment is either a tag or a part of the description, so we sort them in a
+            # single pass.
+            tags = set()
+            description_parts = []
+            for comment in field_comments.get(name, []):
+                if comment.text.startswith("#"):
+                    tags.add(comment.text)
+                else:
+                    description_parts.append(comment.text)
+            fields.append(Field(name=name, tags=tags, description=" ".join(description_parts)))
         # https://stackoverflow.com/a/54119384
         object.__setattr__(self, "fields", fields)
 
@@ -152,32 +152,38 @@ class SQLScript:
                 project=self.table_ref.project,
             )
 
+        # The generated tests carry no comments, and hence no tags, so we don't bother extracting
+        # their fields. Doing so is costly when there are many tests, and nothing depends on them.
         def make_assertion_test(table_ref, field, tag):
             if tag == FieldTag.NO_NULLS:
                 return SQLScript(
                     table_ref=make_table_ref(field, FieldTag.NO_NULLS),
                     code=self.sql_dialect.make_column_test_no_nulls(table_ref, field.name),
                     sql_dialect=self.sql_dialect,
+                    fields=[],
                 )
             elif tag == FieldTag.UNIQUE:
                 return SQLScript(
                     table_ref=make_table_ref(field, FieldTag.UNIQUE),
                     code=self.sql_dialect.make_column_test_unique(table_ref, field.name),
                     sql_dialect=self.sql_dialect,
+                    fields=[],
                 )
-            elif unique_by := re.fullmatch(FieldTag.UNIQUE_BY + r"\((?P<by>.+)\)", tag):
+            elif unique_by := UNIQUE_BY_TAG_REGEX.fullmatch(tag):
                 by = unique_by.group("by")
                 return SQLScript(
                     table_ref=make_table_ref(field, FieldTag.UNIQUE_BY),
                     code=self.sql_dialect.make_column_test_unique_by(table_ref, field.name, by),
                     sql_dialect=self.sql_dialect,
+                    fields=[],
                 )
-            elif set_ := re.fullmatch(FieldTag.SET + r"\{(?P<elements>\w+(?:,\s*\w+)*)\}", tag):
+            elif set_ := SET_TAG_REGEX.fullmatch(tag):
                 elements = {element.strip() for element in set_.group("elements").split(",")}
                 return SQLScript(
                     table_ref=make_table_ref(field, FieldTag.SET),
                     code=self.sql_dialect.make_column_test_set(table_ref, field.name, elements),
                     sql_dialect=self.sql_dialect,
+                    fields=[],
                 )
             else:
                 raise ValueError(f"Unhandled tag: {tag}")
@@ -193,6 +199,9 @@ class SQLScript:
         return dataclasses.replace(self, table_ref=table_ref)
 
     def __rich__(self):
+        # Syntax highlighting pulls in pygments, which is only needed when scripts are printed
+        import rich.syntax
+
         code = textwrap.dedent(self.code).strip()
         code_with_table_ref = f"""-- {self.table_ref}\n\n{code}\n"""
         return rich.syntax.Syntax(code_with_table_ref, "sql", line_numbers=False, theme="ansi_dark")
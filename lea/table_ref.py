@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import dataclasses
 import pathlib
-import re
 
 AUDIT_TABLE_SUFFIX = "___audit"
 
@@ -43,7 +42,7 @@ class TableRef:
 
     def remove_audit_suffix(self) -> TableRef:
         if self.is_audit_table:
-            return dataclasses.replace(self, name=re.sub(rf"{AUDIT_TABLE_SUFFIX}$", "", self.name))
+            return dataclasses.replace(self, name=self.name[: -len(AUDIT_TABLE_SUFFIX)])
         return self
 
     @property
@@ -300,3 +300,36 @@ def test_incremental_field_but_no_incremental_table_selected_and_yet_dependency_
         )
         """,
     )
+
+
+def test_existing_audit_tables_reset(scripts):
+    session = Session(
+        database_client=None,
+        base_dataset="read",
+        write_dataset="write",
+        scripts=scripts,
+        selected_table_refs={TableRef("read", ("analytics",), "n_users", "test_project")},
+        existing_audit_tables={
+            TableRef("write", ("core",), "users___audit", "test_project"): DUMMY_TABLE_STATS,
+        },
+    )
+    script = scripts[TableRef("read", ("analytics",), "n_users", "test_project")]
+
+    assert_queries_are_equal(
+        session.add_context_to_script(script).code,
+        """
+        SELECT COUNT(*)
+        FROM `test_project`.write.core__users___audit
+        """,
+    )
+
+    # This is what happens when the audit tables are deleted, for instance with --restart
+    session.existing_audit_tables = {}
+
+    assert_queries_are_equal(
+        session.add_context_to_script(script).code,
+        """
+        SELECT COUNT(*)
+        FROM `test_project`.write.core__users
+        """,
+    )
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pathlib
+
+import pytest
+
+from lea.dag import DAGOfScripts
+from lea.dialects import BigQueryDialect
+
+
+@pytest.fixture
+def dag(tmp_path: pathlib.Path) -> DAGOfScripts:
+    scripts_dir = tmp_path / "views"
+    for path, code in {
+        "raw/users.sql": "SELECT 1 AS id",
+        "core/users.sql": "SELECT id FROM views.raw__users",
+        "analytics/n_users.sql": "SELECT COUNT(*) AS n FROM views.core__users",
+        "analytics/kpis.sql": "SELECT n FROM views.analytics__n_users",
+    }.items():
+        (scripts_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (scripts_dir / path).write_text(code)
+    return DAGOfScripts.from_directory(
+        scripts_dir=scripts_dir,
+        sql_dialect=BigQueryDialect(),
+        dataset_name="views",
+        project_name="test_project",
+    )
+
+
+@pytest.mark.parametrize(
+    "queries, expected",
+    [
+        pytest.param(queries, expected, id=" ".join(queries))
+        for queries, expected in [
+            (
+                ["*"],
+                {"raw.users", "core.users", "analytics.n_users", "analytics.kpis"},
+            ),
+            (["core.users"], {"core.users"}),
+            (["core.users+"], {"core.users", "analytics.n_users", "analytics.kpis"}),
+            (["+core.users"], {"raw.users", "core.users"}),
+            (
+                ["+core.users+"],
+                {"raw.users", "core.users", "analytics.n_users", "analytics.kpis"},
+            ),
+            (["analytics/"], {"analytics.n_users", "analytics.kpis"}),
+            (
+                ["+analytics/"],
+                {"raw.users", "core.users", "analytics.n_users", "analytics.kpis"},
+            ),
+            (["core/", "raw.users"], {"raw.users", "core.users"}),
+            (["missing.table"], set()),
+        ]
+    ],
+)
+def test_select(dag, queries, expected):
+    selected = dag.select(*queries)
+    assert {".".join([*table_ref.schema, table_ref.name]) for table_ref in selected} == expected